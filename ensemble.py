@@ -0,0 +1,202 @@
+# Imports
+import copy
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from vehiclebatch import VehicleBatch
+
+# Running count, mean and variance of a stream of values, added in batches
+class RunningStats:
+
+	# Constructor
+	def __init__(self):
+		self.count = 0
+		self.mean = 0.0
+		self.m2 = 0.0 # The sum of squared differences from the mean
+
+	# Adds the given array of values to the statistics
+	def add(self, values):
+		values = np.asarray(values, dtype=float)
+		if len(values) == 0:
+			return
+		other = RunningStats()
+		other.count = len(values)
+		other.mean = np.mean(values)
+		other.m2 = np.sum((values - other.mean) ** 2)
+		self.merge(other)
+
+	# Merges the statistics of another stream of values into these ones
+	def merge(self, other):
+		if other.count == 0:
+			return
+		count = self.count + other.count
+		delta = other.mean - self.mean
+		self.mean += delta * other.count / count
+		self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+		self.count = count
+
+	# Gets the mean of the values, or None if there are none
+	def getMean(self):
+		return float(self.mean) if self.count > 0 else None
+
+	# Gets the sample variance of the values, or None if there are none
+	def variance(self):
+		if self.count == 0:
+			return None
+		return float(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+# Statistics of an ensemble of runs, aggregated online so that their size does not depend on the
+# number of replicas or steps
+class EnsembleStats:
+
+	# Constructor
+	def __init__(self, width, height, bins):
+		self.width = width
+		self.height = height
+		self.bins = bins
+		self.replicas = 0
+		self.captures = 0
+		self.distance = RunningStats() # Distance to the nearest source over every step of every replica
+		self.finalDistance = RunningStats() # Distance to the nearest source at the end of each replica
+		self.captureTime = RunningStats() # Time at which each captured replica first reached a source
+		self.occupancy = np.zeros((bins, bins), dtype=np.int64) # Visits to each cell of the space, by row then column
+
+	# Adds the given vehicle locations and their distances to the nearest source (None if there are no sources)
+	# for one step of the replicas
+	def addStep(self, xs, ys, distances):
+		if distances is not None:
+			self.distance.add(distances)
+		cols = np.clip((xs / self.width * self.bins).astype(int), 0, self.bins - 1)
+		rows = np.clip((ys / self.height * self.bins).astype(int), 0, self.bins - 1)
+		self.occupancy += np.bincount(rows * self.bins + cols, minlength=self.bins ** 2).reshape(self.bins, self.bins)
+
+	# Adds the final distances to the nearest source (None if there are no sources) and capture times (nan if never
+	# captured) of finished replicas
+	def addReplicas(self, finalDistances, captureTimes):
+		captured = captureTimes[~np.isnan(captureTimes)]
+		self.replicas += len(captureTimes)
+		self.captures += len(captured)
+		if finalDistances is not None:
+			self.finalDistance.add(finalDistances)
+		self.captureTime.add(captured)
+
+	# Merges the statistics of another part of the ensemble into these ones
+	def merge(self, other):
+		self.replicas += other.replicas
+		self.captures += other.captures
+		self.distance.merge(other.distance)
+		self.finalDistance.merge(other.finalDistance)
+		self.captureTime.merge(other.captureTime)
+		self.occupancy += other.occupancy
+
+	# Gets the fraction of replicas that reached a source
+	def captureRate(self):
+		return self.captures / self.replicas if self.replicas > 0 else 0.0
+
+	# Gets a summary of the statistics, with None for those that have no values, such as the distances in an
+	# environment without sources or the capture time when no replica was captured
+	def summary(self):
+		return {
+			'replicas': self.replicas,
+			'distanceMean': self.distance.getMean(),
+			'distanceVariance': self.distance.variance(),
+			'finalDistanceMean': self.finalDistance.getMean(),
+			'finalDistanceVariance': self.finalDistance.variance(),
+			'captureRate': self.captureRate(),
+			'captureTimeMean': self.captureTime.getMean(),
+			'occupancy': self.occupancy / max(np.sum(self.occupancy), 1)
+		}
+
+
+# Monte Carlo ensemble of noisy replicas of the vehicle and sources in an environment
+class Ensemble:
+
+	# Constructor
+	def __init__(self, environment, replicas, steps, sensorNoise=0, motorNoise=0, seed=0, workers=1):
+		self.replicas = replicas
+		self.steps = steps
+		self.seed = seed
+		self.workers = workers
+		self.blockSize = 256 # The number of replicas stepped together by a worker
+
+		# The field's cached values are built once here, rather than by every block
+		field = copy.deepcopy(environment.state['field'])
+		field.rebuild()
+		self.scene = {
+			'field': field,
+			'sources': environment.getDynamicSources(), # The sources that move or change over time, by index
+			'vehicle': VehicleBatch(environment.state['vehicle'], 1),
+			'width': environment.width,
+			'height': environment.height,
+			'time': environment.time, # The simulation time the replicas start at
+			'timeQuantum': environment.timeQuantum,
+			'steps': steps,
+			'seed': seed,
+			'sensorNoise': sensorNoise, # The standard deviation of the noise added to each sensor input
+			'motorNoise': motorNoise, # The standard deviation of the noise added to each wheel velocity
+			'noiseChunk': 64, # The number of steps of noise drawn at once from each replica's stream
+			'captureRadius': 15, # The distance from a source at which a vehicle is considered to have reached it
+			'occupancyBins': 64 # The number of occupancy histogram cells along each side of the space
+		}
+
+	# Runs the replicas in blocks, spread across the worker processes, and returns their merged statistics
+	def run(self):
+		firsts = list(range(0, self.replicas, self.blockSize))
+		counts = [min(self.blockSize, self.replicas - first) for first in firsts]
+		stats = EnsembleStats(self.scene['width'], self.scene['height'], self.scene['occupancyBins'])
+		if self.workers == 1:
+			for first, count in zip(firsts, counts):
+				stats.merge(runBlock(self.scene, first, count))
+		else:
+			with ProcessPoolExecutor(max_workers=self.workers) as executor:
+				for blockStats in executor.map(runBlock, itertools.repeat(self.scene), firsts, counts):
+					stats.merge(blockStats)
+		return stats
+
+
+# Runs the block of count replicas starting at the given replica index and returns their statistics. Each replica
+# draws its noise from its own stream, spawned from the seed by its index, so results do not depend on how the
+# replicas are split into blocks or across worker processes
+def runBlock(scene, first, count):
+	field = scene['field']
+	if len(scene['sources']) > 0:
+		# Moving the sources in a copy of the field, so that every block starts from the same one
+		field = copy.deepcopy(field)
+	stats = EnsembleStats(scene['width'], scene['height'], scene['occupancyBins'])
+	vehicles = copy.copy(scene['vehicle'])
+	vehicles.setPoses(np.repeat(scene['vehicle'].poses, count, axis=0))
+	noisy = scene['sensorNoise'] > 0 or scene['motorNoise'] > 0
+	streams = [np.random.default_rng(np.random.SeedSequence(scene['seed'], spawn_key=(i,))) for i in range(first, first + count)] if noisy else []
+	captureTimes = np.full(count, np.nan)
+	hasSources = len(field.strengths) > 0
+	sensorNoise = None
+	motorNoise = None
+
+	for step in range(scene['steps']):
+
+		# Drawing the next chunk of noise from each replica's stream, as (step, sensor/wheel, replica)
+		if noisy and step % scene['noiseChunk'] == 0:
+			chunk = min(scene['noiseChunk'], scene['steps'] - step)
+			noise = np.stack([stream.standard_normal((chunk, 4)) for stream in streams], axis=2)
+		if noisy:
+			sensorNoise = scene['sensorNoise'] * noise[step % scene['noiseChunk'], 0:2]
+			motorNoise = scene['motorNoise'] * noise[step % scene['noiseChunk'], 2:4]
+
+		# Moving the sources that change over time and then the vehicles
+		field.advanceSources(scene['sources'], scene['time'] + step * scene['timeQuantum'])
+		rX, rY, lX, lY = vehicles.getSensorLocations()
+		vehicles.processInput(field.getValues(rX, rY), field.getValues(lX, lY), scene['timeQuantum'], sensorNoise, motorNoise)
+		vehicles.wrap(scene['width'], scene['height'])
+
+		# Recording the step, without distances when there is no source to measure them to
+		if not hasSources:
+			stats.addStep(vehicles.x, vehicles.y, None)
+			continue
+		distances = field.getNearestDistances(vehicles.x, vehicles.y)
+		stats.addStep(vehicles.x, vehicles.y, distances)
+		reached = np.isnan(captureTimes) & (distances <= scene['captureRadius'])
+		captureTimes[reached] = (step + 1) * scene['timeQuantum']
+
+	stats.addReplicas(field.getNearestDistances(vehicles.x, vehicles.y) if hasSources else None, captureTimes)
+	return stats
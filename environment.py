@@ -1,6 +1,6 @@
 # Imports
 import tkinter as tk
-import numpy as np
+from field import SourceField
 from source import Source
 from vehicle import Vehicle
 
@@ -16,16 +16,18 @@ class Environment(tk.Frame):
 		self.running = False
 		self.timeQuantum = 10
 		self.sourceStrength = 5
+		self.fieldResolution = 2 # The spacing of the cached source field samples, in pixels
 		self.initCanvas()
 		self.initState()
 
 	# Initializes the environment state
 	def initState(self):
+		self.time = 0
 		self.state = {
-			'sourceXIndices': [],
-			'sourceYIndices': [],
 			'sourcesPoints': [],
 			'sources': [],
+			'dynamicSources': set(),
+			'field': SourceField(self.width, self.height, self.width/8, self.fieldResolution),
 			'vehicle': Vehicle(self, self.canvas, self.width/2, self.height/2)
 		}
 
@@ -49,10 +51,48 @@ class Environment(tk.Frame):
 
 	# Adds a source to the current environment state
 	def addSource(self, x, y):
-		self.state['sourceXIndices'].append(x)
-		self.state['sourceYIndices'].append(y)
+		source = Source(self.canvas, (x+1)*(self.width/8), (y+1)*(self.height/8), self.sourceStrength)
 		self.state['sourcesPoints'].append((x, y))
-		self.state['sources'].append(Source(self.canvas, (x+1)*(self.width/8), (y+1)*(self.height/8)))
+		self.state['sources'].append(source)
+		self.state['field'].addSource(source.x, source.y, source.strength)
+		return source
+
+	# Sets the source at the given index to travel along the given closed path of canvas points
+	def setSourcePath(self, index, points, speed):
+		self.state['sources'][index].setPath(points, speed)
+		self.addDynamicSource(index)
+
+	# Sets the strength of the source at the given index to oscillate over the given period
+	def setSourcePulse(self, index, period, depth):
+		self.state['sources'][index].setPulse(period, depth)
+		self.addDynamicSource(index)
+
+	# Sets the source at the given index to switch on and off for the given durations
+	def setSourceBlink(self, index, onDuration, offDuration):
+		self.state['sources'][index].setBlink(onDuration, offDuration)
+		self.addDynamicSource(index)
+
+	# Registers the source at the given index to be updated at each step of the simulation
+	def addDynamicSource(self, index):
+		self.state['dynamicSources'].add(index)
+
+	# Gets copies of the dynamic sources by index without their canvas displays, for stepping them in headless runs
+	def getDynamicSources(self):
+		return {index: self.state['sources'][index].getDetached() for index in self.state['dynamicSources']}
+
+	# Updates the dynamic sources for the current time, only updating the field for those that changed
+	def updateSources(self):
+		changed = []
+		for index in self.state['dynamicSources']:
+			if self.state['sources'][index].update(self.time):
+				changed.append(index)
+		if len(changed) > 0:
+			sources = [self.state['sources'][index] for index in changed]
+			self.state['field'].updateSources(
+				changed,
+				[source.x for source in sources],
+				[source.y for source in sources],
+				[source.strength for source in sources])
 
 	# Resets the state of the environment i.e. removes any sources and resets the vehicle
 	def resetState(self):
@@ -64,10 +104,7 @@ class Environment(tk.Frame):
 
 	# Gets the source value at the given canvas location
 	def getSourceValue(self, x, y):
-		distances = (np.array(self.state['sourceXIndices']) - (x/(self.width/8)) + 1) ** 2 + (np.array(self.state['sourceYIndices']) - (y/(self.width/8)) + 1) **2
-		distances = np.sqrt(distances)
-		strengths = self.sourceStrength / distances ** 2
-		return np.sum(strengths)
+		return self.state['field'].getValue(x, y)
 
 	# Starts the environment simulation
 	def run(self):
@@ -78,6 +115,9 @@ class Environment(tk.Frame):
 	def moveVehicle(self):
 		if (self.running):
 
+			# Updating any sources that change over time
+			self.updateSources()
+
 			# Having the vehicle process the inputs at the given location
 			rInput = self.getSourceValue(self.state['vehicle'].rSensor['x'], self.state['vehicle'].rSensor['y'])
 			lInput = self.getSourceValue(self.state['vehicle'].lSensor['x'], self.state['vehicle'].lSensor['y'])
@@ -94,6 +134,7 @@ class Environment(tk.Frame):
 				self.state['vehicle'].moveTo(self.state['vehicle'].x, self.state['vehicle'].y - self.height)
 
 			# Calling to move the vehicle again
+			self.time += self.timeQuantum
 			self.canvas.after(self.timeQuantum, self.moveVehicle)
 
 	# Pauses the environment simulation
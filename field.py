@@ -0,0 +1,127 @@
+# Imports
+import numpy as np
+
+# Field of source values, independent of any display. The sources are kept in arrays that are updated in place,
+# and values at a few points are summed exactly from them. For sampling many points at once, such as a batch of
+# vehicles, the values are also cached on a grid of sample points, which is only built once it is first needed
+class SourceField:
+
+	# Constructor
+	def __init__(self, width, height, cellSize, resolution=2, rebuildFraction=0.5):
+		self.width = width
+		self.height = height
+		self.cellSize = cellSize # The length of a grid cell, in which source distances are measured
+		self.resolution = resolution # The spacing of the cached field samples, in pixels
+		self.rebuildFraction = rebuildFraction # The fraction of changed sources above which the field is rebuilt from scratch
+		self.minDistance = self.resolution / self.cellSize # The distance below which the field is capped, in grid cells
+		self.xs = np.array([])
+		self.ys = np.array([])
+		self.strengths = np.array([])
+		self.sampleXs = np.arange(0, self.width + self.resolution, self.resolution) / self.cellSize
+		self.sampleYs = np.arange(0, self.height + self.resolution, self.resolution) / self.cellSize
+		self.values = None # The cached values at the sample points, or None until they are needed
+
+	# Adds a source at the given canvas location with the given strength, returning its index
+	def addSource(self, x, y, strength):
+		self.xs = np.append(self.xs, x / self.cellSize)
+		self.ys = np.append(self.ys, y / self.cellSize)
+		self.strengths = np.append(self.strengths, strength)
+		self.addContribution(x / self.cellSize, y / self.cellSize, strength)
+		return len(self.strengths) - 1
+
+	# Adds the contribution of a source at the given location (in grid cells) and strength to the cached values
+	def addContribution(self, x, y, strength, sign=1):
+		if strength == 0 or self.values is None:
+			return
+		distances = (self.sampleYs[:, np.newaxis] - y) ** 2 + (self.sampleXs[np.newaxis, :] - x) ** 2
+		self.values += sign * strength / np.maximum(distances, self.minDistance ** 2)
+
+	# Updates the sources at the given indices to the given canvas locations and strengths, swapping their old
+	# contributions to the cached values for the new ones, or rebuilding the cache if most of the sources changed
+	def updateSources(self, indices, xs, ys, strengths):
+		rebuild = self.values is not None and len(indices) > self.rebuildFraction * len(self.strengths)
+		for index, x, y, strength in zip(indices, xs, ys, strengths):
+			if not rebuild:
+				self.addContribution(self.xs[index], self.ys[index], self.strengths[index], -1)
+				self.addContribution(x / self.cellSize, y / self.cellSize, strength)
+			self.xs[index] = x / self.cellSize
+			self.ys[index] = y / self.cellSize
+			self.strengths[index] = strength
+		if rebuild:
+			self.rebuild()
+
+	# Moves the given sources (a dict of Source by index) to their states at the given simulation time (ms),
+	# only updating those that moved or changed strength
+	def advanceSources(self, sources, time):
+		indices = []
+		xs = []
+		ys = []
+		strengths = []
+		for index, source in sources.items():
+			x, y, strength = source.getState(time)
+			if x / self.cellSize != self.xs[index] or y / self.cellSize != self.ys[index] or strength != self.strengths[index]:
+				indices.append(index)
+				xs.append(x)
+				ys.append(y)
+				strengths.append(strength)
+		if len(indices) > 0:
+			self.updateSources(indices, xs, ys, strengths)
+
+	# Rebuilds the cached values from all of the current sources, a chunk of sources at a time. An existing cache
+	# is refilled in place, so that it can be shared between processes
+	def rebuild(self):
+		if self.values is None:
+			self.values = np.zeros((len(self.sampleYs), len(self.sampleXs)))
+		else:
+			self.values.fill(0)
+		chunk = 32
+		for first in range(0, len(self.strengths), chunk):
+			xs = self.xs[first:first + chunk, np.newaxis, np.newaxis]
+			ys = self.ys[first:first + chunk, np.newaxis, np.newaxis]
+			strengths = self.strengths[first:first + chunk, np.newaxis, np.newaxis]
+			distances = (self.sampleYs[np.newaxis, :, np.newaxis] - ys) ** 2 + (self.sampleXs[np.newaxis, np.newaxis, :] - xs) ** 2
+			self.values += np.sum(strengths / np.maximum(distances, self.minDistance ** 2), axis=0)
+
+	# Gets the source value at the given canvas location, summed exactly from the sources
+	def getValue(self, x, y):
+		return self.getExactValues(np.array([x]), np.array([y]))[0]
+
+	# Gets the source values at the given arrays of canvas locations, interpolated from the cached values
+	# on the canvas and computed directly from the sources outside of it
+	def getValues(self, xs, ys):
+		if self.values is None:
+			self.rebuild()
+		xs = np.asarray(xs, dtype=float)
+		ys = np.asarray(ys, dtype=float)
+		rows, cols = self.values.shape
+		col = np.clip(xs / self.resolution, 0, cols - 1)
+		row = np.clip(ys / self.resolution, 0, rows - 1)
+		c0 = np.minimum(col.astype(int), cols - 2)
+		r0 = np.minimum(row.astype(int), rows - 2)
+		dc = col - c0
+		dr = row - r0
+		top = self.values[r0, c0] * (1 - dc) + self.values[r0, c0+1] * dc
+		bottom = self.values[r0+1, c0] * (1 - dc) + self.values[r0+1, c0+1] * dc
+		values = top * (1 - dr) + bottom * dr
+
+		# Computing the values directly for locations off the canvas
+		outside = (xs < 0) | (xs > self.width) | (ys < 0) | (ys > self.height)
+		if np.any(outside):
+			values[outside] = self.getExactValues(xs[outside], ys[outside])
+		return values
+
+	# Gets the source values at the given arrays of canvas locations directly from the sources
+	def getExactValues(self, xs, ys):
+		xs = np.asarray(xs, dtype=float)[:, np.newaxis] / self.cellSize
+		ys = np.asarray(ys, dtype=float)[:, np.newaxis] / self.cellSize
+		distances = (self.xs[np.newaxis, :] - xs) ** 2 + (self.ys[np.newaxis, :] - ys) ** 2
+		return np.sum(self.strengths / np.maximum(distances, self.minDistance ** 2), axis=1)
+
+	# Gets the distance (in pixels) from each of the given canvas locations to its nearest source
+	def getNearestDistances(self, xs, ys):
+		if len(self.strengths) == 0:
+			return np.full(len(xs), np.inf)
+		xs = np.asarray(xs, dtype=float)[:, np.newaxis] / self.cellSize
+		ys = np.asarray(ys, dtype=float)[:, np.newaxis] / self.cellSize
+		distances = (self.xs[np.newaxis, :] - xs) ** 2 + (self.ys[np.newaxis, :] - ys) ** 2
+		return np.sqrt(np.min(distances, axis=1)) * self.cellSize
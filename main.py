@@ -30,6 +30,9 @@ app = None
 
 import sys, os
 
+# Import multiprocessing so worker processes can start from a frozen executable
+import multiprocessing
+
 # Import Tkinter for GUI handling
 import tkinter as tk
 from tkinter import messagebox
@@ -334,4 +337,5 @@ def main():
 	app.mainloop()
 
 if __name__ == '__main__':
+	multiprocessing.freeze_support()
 	main()
@@ -0,0 +1,47 @@
+# Stand-ins for the Tk display used by the tests, so the simulation can be stepped without a window
+
+# Imports
+from environment import Environment
+
+# Canvas stand-in that only hands out drawing ids
+class MockCanvas:
+
+	# Constructor
+	def __init__(self):
+		self.items = 0
+
+	# Creates a drawing, returning its id
+	def create_polygon(self, *args, **kwargs):
+		self.items += 1
+		return self.items
+
+	# Creates an oval drawing, returning its id
+	def create_oval(self, *args, **kwargs):
+		self.items += 1
+		return self.items
+
+	# Moves a drawing
+	def coords(self, item, *args):
+		pass
+
+	# Changes the options of a drawing
+	def itemconfig(self, item, **kwargs):
+		pass
+
+	# Deletes a drawing
+	def delete(self, item):
+		pass
+
+
+# Creates an environment drawing on a mock canvas, without the Tk frame around it
+def createEnvironment():
+	environment = Environment.__new__(Environment)
+	environment.width = 512
+	environment.height = 512
+	environment.running = False
+	environment.timeQuantum = 10
+	environment.sourceStrength = 5
+	environment.fieldResolution = 2
+	environment.canvas = MockCanvas()
+	environment.initState()
+	return environment
@@ -1,18 +1,123 @@
+# Imports
+import copy
+import math
+import numpy as np
+
 # Source canvas object to display
 class Source:
 
 	# Constructor
-	def __init__(self, canvas, x, y):
+	def __init__(self, canvas, x, y, strength=5):
 		self.radius = 8
 		self.canvas = canvas
 		self.x = x
 		self.y = y
+		self.baseX = x
+		self.baseY = y
+		self.strength = strength
+		self.baseStrength = strength
+		self.onColor = '#FFFFFF'
+		self.offColor = '#555555'
+
+		# The time-varying behaviours of the source (None when not in use)
+		self.path = None
+		self.pulse = None
+		self.blink = None
+
 		self.source = self.canvas.create_oval(
 			x-self.radius,
 			y-self.radius,
 			x+self.radius,
 			y+self.radius,
-			fill='#FFFFFF')
+			fill=self.onColor)
+
+	# Sets the closed path of canvas points the source travels along at the given speed (pixels per ms)
+	def setPath(self, points, speed):
+		if speed < 0:
+			raise ValueError('speed must not be negative, but got ' + str(speed))
+		points = np.array(list(points) + [points[0]], dtype=float)
+		lengths = np.sqrt(np.sum(np.diff(points, axis=0) ** 2, axis=1))
+		if np.sum(lengths) == 0:
+			raise ValueError('path must contain at least two distinct points')
+		self.path = {
+			'points': points,
+			'distances': np.concatenate(([0], np.cumsum(lengths))),
+			'speed': speed
+		}
+
+	# Sets the source strength to oscillate by the given fraction of its base strength over the given period (ms)
+	def setPulse(self, period, depth):
+		if period <= 0:
+			raise ValueError('period must be positive, but got ' + str(period))
+		if depth < 0 or depth > 1:
+			raise ValueError('depth must be between 0 and 1, but got ' + str(depth))
+		self.pulse = {
+			'period': period,
+			'depth': depth
+		}
+
+	# Sets the source to switch on and off for the given durations (ms)
+	def setBlink(self, onDuration, offDuration):
+		if onDuration <= 0 or offDuration <= 0:
+			raise ValueError('durations must be positive, but got ' + str(onDuration) + ' and ' + str(offDuration))
+		self.blink = {
+			'onDuration': onDuration,
+			'offDuration': offDuration
+		}
+
+	# Gets the position and strength of the source at the given simulation time (ms)
+	def getState(self, time):
+		x, y = self.baseX, self.baseY
+		strength = self.baseStrength
+
+		# Getting the location along the path
+		if self.path is not None:
+			distances = self.path['distances']
+			travelled = (self.path['speed'] * time) % distances[-1]
+			i = min(np.searchsorted(distances, travelled, side='right') - 1, len(distances) - 2)
+			ratio = (travelled - distances[i]) / (distances[i+1] - distances[i]) if distances[i+1] > distances[i] else 0
+			x, y = self.path['points'][i] + ratio * (self.path['points'][i+1] - self.path['points'][i])
+
+		# Getting the strength of the pulse
+		if self.pulse is not None:
+			strength *= 1 + self.pulse['depth'] * math.sin(2 * math.pi * time / self.pulse['period'])
+
+		# Switching the source off if it is blinking
+		if self.blink is not None:
+			if time % (self.blink['onDuration'] + self.blink['offDuration']) >= self.blink['onDuration']:
+				strength = 0
+
+		return x, y, strength
+
+	# Updates the position and strength of the source for the given simulation time (ms), returning
+	# whether or not either of them changed
+	def update(self, time):
+		x, y, strength = self.getState(time)
+		changed = x != self.x or y != self.y or strength != self.strength
+		if x != self.x or y != self.y:
+			self.moveTo(x, y)
+		if (strength == 0) != (self.strength == 0):
+			self.canvas.itemconfig(self.source, fill=self.offColor if strength == 0 else self.onColor)
+		self.strength = strength
+		return changed
+
+	# Gets a copy of the source without its canvas display, for stepping it away from the canvas
+	def getDetached(self):
+		source = copy.copy(self)
+		source.canvas = None
+		source.source = None
+		return source
+
+	# Moves the source's center to the given point, updating the canvas display in place
+	def moveTo(self, x, y):
+		self.x = x
+		self.y = y
+		self.canvas.coords(
+			self.source,
+			x-self.radius,
+			y-self.radius,
+			x+self.radius,
+			y+self.radius)
 
 	# Deletes the canvas display of the source
 	def destroy(self):
@@ -0,0 +1,289 @@
+# Imports
+import copy
+import itertools
+import numpy as np
+from vehiclebatch import VehicleBatch
+
+# Online detector of a vehicle settling into a fixed point, a periodic orbit or straight travel around the wrapped
+# space, from the history of its poses
+class SteadyStateDetector:
+
+	# Constructor
+	def __init__(self, width, height, maxPeriod=2000):
+		self.width = width
+		self.height = height
+		self.maxPeriod = maxPeriod # The longest orbit, in steps, that can be detected by returning to a pose
+		self.positionQuantum = 1.0 # The size of the cells locations are quantized to for hashing, in pixels
+		self.headingQuantum = 0.02 # The size of the cells headings are quantized to for hashing, in radians
+		self.positionTolerance = 0.05 # The distance within which two locations are considered the same, in pixels
+		self.headingTolerance = 1e-3 # The difference within which two headings are considered the same
+		self.motionTolerance = 1e-7 # The difference within which two steps make the same move, or a step makes no move at all
+		self.straightTolerance = 1e-9 # The heading change per step below which a vehicle is considered to travel straight
+		self.settleSteps = 20 # The number of steps a vehicle must hold still or make the same move to be settled
+		self.steps = 0
+		self.history = np.zeros((maxPeriod + 1, 4)) # The most recent poses, indexed by step modulo its length
+		self.seen = {} # The last step at which each quantized pose was seen
+		self.stillSteps = 0
+		self.motion = None # The move of the last step relative to the vehicle, as [sideways, forward, turn]
+		self.motionSteps = 0
+		self.candidate = None # The period of an orbit being confirmed
+		self.confirmedSteps = 0
+		self.behaviour = None
+		self.period = None
+		self.turn = None # The heading change per step of a vehicle settled into making the same move every step
+
+	# Gets the difference between two poses, with the locations wrapped around the space
+	def getDifference(self, pose, other):
+		difference = pose - other
+		difference[0] = (difference[0] + self.width/2) % self.width - self.width/2
+		difference[1] = (difference[1] + self.height/2) % self.height - self.height/2
+		return difference
+
+	# Whether or not two pose differences are the same within tolerance
+	def isSame(self, difference, other):
+		return np.hypot(difference[0] - other[0], difference[1] - other[1]) < self.positionTolerance and \
+			np.hypot(difference[2] - other[2], difference[3] - other[3]) < self.headingTolerance
+
+	# Gets the move from the given previous pose to the given pose, relative to the previous pose, as the distance
+	# along the wheel axis, the distance forward and the heading change
+	def getMotion(self, pose, previous):
+		difference = self.getDifference(pose, previous)
+		ux, uy = previous[2:4]
+		return np.array([
+			difference[0] * ux + difference[1] * uy,
+			difference[0] * uy - difference[1] * ux,
+			np.arctan2(ux * pose[3] - uy * pose[2], ux * pose[2] + uy * pose[3])])
+
+	# Adds the pose [x, y, ux, uy] of the next step, returning the behaviour of the vehicle once it has settled
+	# ('fixed', 'cycle' or 'straight') and None until then
+	def update(self, pose):
+		if self.behaviour is not None:
+			return self.behaviour
+		step = self.steps
+		size = len(self.history)
+		zero = np.zeros(4)
+
+		# Checking for the vehicle holding still, or making the same move relative to itself as the previous step
+		if step > 0:
+			motion = self.getMotion(pose, self.history[(step - 1) % size])
+			self.stillSteps = self.stillSteps + 1 if np.all(np.abs(motion) < self.motionTolerance) else 0
+			if self.stillSteps == 0 and self.motion is not None and np.all(np.abs(motion - self.motion) < self.motionTolerance):
+				self.motionSteps += 1
+			else:
+				self.motionSteps = 0
+			self.motion = motion
+		self.history[step % size] = pose
+		self.steps += 1
+
+		if self.stillSteps >= self.settleSteps:
+			self.behaviour = 'fixed'
+			self.period = 1
+
+		# A vehicle making the same move every step travels in a straight line or around a circle, whose period need
+		# not be a whole number of steps
+		elif self.motionSteps >= self.settleSteps:
+			if abs(self.motion[2]) < self.straightTolerance:
+				self.behaviour = 'straight'
+				self.turn = 0.0
+			else:
+				self.behaviour = 'cycle'
+				self.turn = self.motion[2]
+				self.period = 2 * np.pi / abs(self.turn)
+
+		# Confirming an orbit by checking every step of one more period against the one before it
+		elif self.candidate is not None:
+			if self.isSame(self.getDifference(pose, self.history[(step - self.candidate) % size]), zero):
+				self.confirmedSteps += 1
+				if self.confirmedSteps >= self.candidate:
+					self.behaviour = 'cycle'
+					self.period = self.candidate
+			else:
+				self.candidate = None
+
+		# Looking for a return to a previously seen pose, leaving a vehicle back where it was a step before to the
+		# checks for holding still or making the same move
+		else:
+			key = (
+				int(pose[0] // self.positionQuantum),
+				int(pose[1] // self.positionQuantum),
+				int(np.arctan2(pose[3], pose[2]) // self.headingQuantum))
+			last = self.seen.get(key)
+			if last is not None and 1 < step - last <= self.maxPeriod and \
+					self.isSame(self.getDifference(pose, self.history[last % size]), zero):
+				self.candidate = step - last
+				self.confirmedSteps = 0
+			self.seen[key] = step
+
+		# Forgetting poses too old to be part of a detectable orbit
+		if step % self.maxPeriod == self.maxPeriod - 1:
+			self.seen = {key: last for key, last in self.seen.items() if step - last <= self.maxPeriod}
+
+		return self.behaviour
+
+	# Rejects a straight line or circle that turned out not to hold, so that detection carries on
+	def reject(self):
+		self.behaviour = None
+		self.period = None
+		self.turn = None
+		self.motionSteps = 0
+
+
+# Gets the poses a vehicle making the same move every step reaches the given numbers of steps after the given pose,
+# where delta is the difference from the previous pose and turn the heading change per step
+def getPathPoses(pose, delta, turn, steps, width, height):
+	# Gets the locations k steps along the path, before wrapping them around the space
+	def getLocations(k):
+		if turn == 0:
+			return pose[0] + k * delta[0], pose[1] + k * delta[1]
+		return (
+			xOld * np.cos(k * turn) - yOld * np.sin(k * turn) + center[0],
+			xOld * np.sin(k * turn) + yOld * np.cos(k * turn) + center[1])
+
+	if turn != 0:
+		# Finding the center the vehicle turns about, which the step from the previous pose is a rotation around
+		cosTurn = np.cos(turn)
+		sinTurn = np.sin(turn)
+		previous = pose[0:2] - delta[0:2]
+		rotated = np.array([previous[0] * cosTurn - previous[1] * sinTurn, previous[0] * sinTurn + previous[1] * cosTurn])
+		center = np.linalg.solve(np.array([[1 - cosTurn, sinTurn], [-sinTurn, 1 - cosTurn]]), pose[0:2] - rotated)
+		xOld = pose[0] - center[0]
+		yOld = pose[1] - center[1]
+	xs, ys = getLocations(steps)
+	xsBefore, ysBefore = getLocations(steps - 1)
+
+	# Wrapping the locations as Environment.moveVehicle does, which leaves a vehicle arriving exactly on the far
+	# edge there rather than on the near one
+	xsWrapped = xs % width
+	ysWrapped = ys % height
+	xsWrapped[(xsWrapped == 0) & (xs > xsBefore)] = width
+	ysWrapped[(ysWrapped == 0) & (ys > ysBefore)] = height
+
+	cosVals = np.cos(steps * turn)
+	sinVals = np.sin(steps * turn)
+	return np.column_stack((
+		xsWrapped,
+		ysWrapped,
+		pose[2] * cosVals - pose[3] * sinVals,
+		pose[2] * sinVals + pose[3] * cosVals))
+
+
+# Follows the straight line or circle of the given vehicle over the remaining steps, a chunk at a time, checking that
+# the field keeps its wheels at the same speeds all the way round. Returns the step at which the speeds change, or
+# None along with the totals of the metrics over the remaining steps if they never do
+def followPath(environment, vehicles, delta, turn, remaining, captureRadius, chunk=2048):
+	field = environment.state['field']
+	path = copy.copy(vehicles)
+	rX, rY, lX, lY = vehicles.getSensorLocations()
+	vRight, vLeft = vehicles.getWheelSpeeds(field.getExactValues(rX, rY), field.getExactValues(lX, lY))
+	totals = np.zeros(3)
+	for first in range(1, remaining + 1, chunk):
+		steps = np.arange(first, min(first + chunk, remaining + 1))
+		path.setPoses(getPathPoses(vehicles.poses[0], delta, turn, steps, environment.width, environment.height))
+
+		# Checking the wheel speeds for the steps after these ones
+		rX, rY, lX, lY = path.getSensorLocations()
+		rights, lefts = path.getWheelSpeeds(field.getExactValues(rX, rY), field.getExactValues(lX, lY))
+		changed = np.flatnonzero((np.abs(rights - vRight[0]) > 1e-9) | (np.abs(lefts - vLeft[0]) > 1e-9))
+		changed = changed[steps[changed] < remaining]
+		if len(changed) > 0:
+			return steps[changed[0]], None
+
+		distances = field.getNearestDistances(path.x, path.y)
+		totals[0] += len(steps) * np.hypot(delta[0], delta[1])
+		totals[1] += np.sum(distances)
+		totals[2] += environment.timeQuantum * np.count_nonzero(distances <= captureRadius)
+	return None, totals
+
+
+# Runs one copy of the given vehicles (by default the environment's vehicle) for up to the given number of steps,
+# stopping once it settles and optionally extrapolating the summary metrics over the steps that were skipped. Only
+# static sources are supported, since a vehicle that seems settled in a changing field need not stay so
+def runUntilSteady(environment, steps, extrapolate=True, vehicles=None, captureRadius=15):
+	if len(environment.state['dynamicSources']) > 0:
+		raise ValueError('steady states can only be detected among static sources, but ' + str(len(environment.state['dynamicSources'])) + ' sources change over time')
+	field = environment.state['field']
+	if vehicles is None:
+		vehicles = VehicleBatch(environment.state['vehicle'], 1)
+	detector = SteadyStateDetector(environment.width, environment.height)
+	metrics = np.zeros((len(detector.history), 3)) # The path length, distance to the nearest source and time near one for each recent step
+	totals = np.zeros(3)
+	pathTotals = None
+	holdUntil = 0 # The step before which straight lines and circles are known not to hold
+
+	ran = 0
+	while ran < steps:
+		previous = vehicles.poses[0].copy()
+		rX, rY, lX, lY = vehicles.getSensorLocations()
+		vehicles.processInput(field.getExactValues(rX, rY), field.getExactValues(lX, lY), environment.timeQuantum)
+		vehicles.wrap(environment.width, environment.height)
+		difference = detector.getDifference(vehicles.poses[0], previous)
+		distance = field.getNearestDistances(vehicles.x, vehicles.y)[0]
+		row = [np.hypot(difference[0], difference[1]), distance, environment.timeQuantum if distance <= captureRadius else 0]
+		metrics[ran % len(metrics)] = row
+		totals += row
+		detector.update(vehicles.poses[0])
+		ran += 1
+		if detector.behaviour is None:
+			continue
+		if detector.turn is None or ran == steps:
+			break
+
+		# Only stopping on a straight line or circle once the field is known to keep the wheels as they are along it
+		if ran >= holdUntil:
+			changedAt, pathTotals = followPath(environment, vehicles, difference, detector.turn, steps - ran, captureRadius)
+			if changedAt is None:
+				break
+			holdUntil = ran + changedAt
+		detector.reject()
+
+	extrapolated = extrapolate and detector.behaviour is not None and ran < steps
+	if extrapolated and detector.turn is not None:
+		totals += pathTotals
+
+	# Repeating the metrics of the last period over the remaining steps, with a fixed vehicle travelling no further
+	elif extrapolated:
+		period = detector.period
+		remaining = steps - ran
+		rows = metrics[[(ran - period + i) % len(metrics) for i in range(period)]]
+		if detector.behaviour == 'fixed':
+			rows[:, 0] = 0
+		totals += remaining // period * np.sum(rows, axis=0) + np.sum(rows[:remaining % period], axis=0)
+	counted = steps if extrapolated else ran
+
+	return {
+		'behaviour': detector.behaviour,
+		'period': detector.period,
+		'steps': steps,
+		'stepsRun': ran,
+		'speedup': steps / ran if extrapolated else 1.0,
+		'extrapolated': extrapolated,
+		'pathLength': float(totals[0]),
+		'meanDistance': float(totals[1] / counted) if counted > 0 else 0.0,
+		'timeNearSource': float(totals[2]),
+		'pose': vehicles.poses[0].copy()
+	}
+
+
+# Runs the environment's vehicle with every combination of sensor attachments and inhibitions, stopping each run
+# once it settles, and returns the summary of each run along with its wiring
+def sweepWirings(environment, steps, extrapolate=True):
+	template = VehicleBatch(environment.state['vehicle'], 1)
+	summaries = []
+	for lAttach, rAttach, lSInhibit, rSInhibit, lWInhibit, rWInhibit in itertools.product(['left', 'right'], ['left', 'right'], [False, True], [False, True], [False, True], [False, True]):
+		vehicles = copy.copy(template)
+		vehicles.setPoses(template.poses.copy())
+		vehicles.lSensor = {'inhibitory': lSInhibit, 'attachment': lAttach}
+		vehicles.rSensor = {'inhibitory': rSInhibit, 'attachment': rAttach}
+		vehicles.lWheelInhibitory = lWInhibit
+		vehicles.rWheelInhibitory = rWInhibit
+		summary = runUntilSteady(environment, steps, extrapolate, vehicles)
+		summary['wiring'] = {
+			'leftSensorAttachment': lAttach,
+			'rightSensorAttachment': rAttach,
+			'leftSensorInhibit': lSInhibit,
+			'rightSensorInhibit': rSInhibit,
+			'leftWheelInhibit': lWInhibit,
+			'rightWheelInhibit': rWInhibit
+		}
+		summaries.append(summary)
+	return summaries
@@ -0,0 +1,240 @@
+# Imports
+import copy
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from threading import BrokenBarrierError
+import numpy as np
+from vehiclebatch import VehicleBatch
+
+# Swarm of vehicles sharing one wiring, with the wrapped space split into tiles that are each stepped by their own
+# worker process. The vehicles of each tile and the source field live in shared memory, so nothing is pickled per
+# step, and vehicles that cross into another tile migrate to it between steps
+class Swarm:
+
+	# Constructor, placing count copies of the environment's vehicle at random locations and headings
+	def __init__(self, environment, count, tiles=(2, 2), seed=0):
+		self.field = copy.deepcopy(environment.state['field'])
+		self.field.rebuild()
+		self.sources = environment.getDynamicSources() # The sources that move or change over time, by index
+		self.vehicle = VehicleBatch(environment.state['vehicle'], 1)
+		self.width = environment.width
+		self.height = environment.height
+		self.time = environment.time # The simulation time of the next step
+		self.timeQuantum = environment.timeQuantum
+		self.tiles = tiles # The number of tiles along the x and y axes, one worker process each
+
+		rng = np.random.default_rng(seed)
+		angles = rng.uniform(0, 2 * np.pi, count)
+		self.poses = np.column_stack((
+			rng.uniform(0, self.width, count),
+			rng.uniform(0, self.height, count),
+			np.cos(angles),
+			np.sin(angles)))
+
+	# Runs the swarm for the given number of steps, updating the vehicle poses, and returns a report of the
+	# time spent by each worker
+	def run(self, steps):
+		tileCount = self.tiles[0] * self.tiles[1]
+		# Vehicles gather at sources, so any one tile may end up with all of them. Each tile is given room for the
+		# whole swarm, of which only the pages that are used get touched
+		capacity = max(len(self.poses), 1)
+		specs = {
+			'poses': ((tileCount, capacity, 4), np.float64), # The vehicles owned by each tile
+			'counts': ((tileCount,), np.int64), # The number of vehicles owned by each tile
+			'outbox': ((tileCount, capacity, 5), np.float64), # The vehicles leaving each tile, with their new tile
+			'outCounts': ((tileCount,), np.int64),
+			'timings': ((tileCount, 3), np.float64), # The busy time, barrier wait time and migrations of each worker
+			'values': (self.field.values.shape, np.float64),
+			'xs': (self.field.xs.shape, np.float64),
+			'ys': (self.field.ys.shape, np.float64),
+			'strengths': (self.field.strengths.shape, np.float64)
+		}
+		blocks = {}
+		arrays = {}
+		try:
+			# Creating the shared arrays and filling them with the sources and the vehicles of each tile
+			self.field.advanceSources(self.sources, self.time)
+			for key, (shape, dtype) in specs.items():
+				blocks[key], arrays[key] = createSharedArray(shape, dtype)
+			for key in ['values', 'xs', 'ys', 'strengths']:
+				arrays[key][:] = getattr(self.field, key)
+			owners = getTiles(self.poses[:, 0], self.poses[:, 1], self.width, self.height, self.tiles)
+			for tile in range(tileCount):
+				poses = self.poses[owners == tile]
+				arrays['poses'][tile, :len(poses)] = poses
+				arrays['counts'][tile] = len(poses)
+
+			# The field is sent to the workers without its arrays, which they read from shared memory instead
+			field = copy.copy(self.field)
+			field.values = field.xs = field.ys = field.strengths = None
+			scene = {
+				'field': field,
+				'sources': self.sources,
+				'vehicle': self.vehicle,
+				'width': self.width,
+				'height': self.height,
+				'time': self.time,
+				'timeQuantum': self.timeQuantum,
+				'tiles': self.tiles,
+				'steps': steps,
+				'blocks': {key: (blocks[key].name, shape, dtype) for key, (shape, dtype) in specs.items()}
+			}
+
+			# Running a worker per tile
+			barrier = mp.Barrier(tileCount)
+			workers = [mp.Process(target=runTile, args=(scene, tile, barrier)) for tile in range(tileCount)]
+			start = time.perf_counter()
+			for worker in workers:
+				worker.start()
+
+			# Watching the workers, and releasing the others from the barrier if one fails or is killed
+			while any(worker.is_alive() for worker in workers):
+				for worker in workers:
+					worker.join(0.1)
+					if worker.exitcode is not None and worker.exitcode != 0:
+						barrier.abort()
+			wallTime = time.perf_counter() - start
+
+			if any(worker.exitcode != 0 for worker in workers):
+				raise RuntimeError('a swarm worker exited unexpectedly')
+
+			# Gathering the vehicles and the moved sources back from the tiles
+			self.poses = np.concatenate([arrays['poses'][tile, :arrays['counts'][tile]] for tile in range(tileCount)])
+			for key in ['values', 'xs', 'ys', 'strengths']:
+				getattr(self.field, key)[:] = arrays[key]
+			self.time += steps * self.timeQuantum
+			timings = arrays['timings'].copy()
+		finally:
+			arrays.clear()
+			for block in blocks.values():
+				block.close()
+				block.unlink()
+
+		return {
+			'workers': tileCount,
+			'steps': steps,
+			'vehicles': len(self.poses),
+			'wallTime': wallTime,
+			'busyTimes': timings[:, 0],
+			'waitTimes': timings[:, 1],
+			'migrations': int(np.sum(timings[:, 2])),
+			'efficiencies': timings[:, 0] / wallTime # The fraction of the run each worker's core spent stepping vehicles
+		}
+
+
+# Creates a block of shared memory holding an array of the given shape and type, returning the block and the array.
+# New shared memory is zero-filled by the system, so the array is not cleared here, which would commit every page
+def createSharedArray(shape, dtype):
+	size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+	block = shared_memory.SharedMemory(create=True, size=size)
+	return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+# Attaches to the named block of shared memory, returning the block and the array it holds
+def attachSharedArray(name, shape, dtype):
+	block = shared_memory.SharedMemory(name=name)
+	return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+# Gets the index of the tile containing each of the given locations
+def getTiles(xs, ys, width, height, tiles):
+	cols = np.clip((xs / width * tiles[0]).astype(int), 0, tiles[0] - 1)
+	rows = np.clip((ys / height * tiles[1]).astype(int), 0, tiles[1] - 1)
+	return rows * tiles[0] + cols
+
+
+# Attaches to the shared arrays and steps the vehicles of the given tile
+def runTile(scene, tile, barrier):
+	blocks = {}
+	arrays = {}
+	try:
+		for key, (name, shape, dtype) in scene['blocks'].items():
+			blocks[key], arrays[key] = attachSharedArray(name, shape, dtype)
+		for key in ['values', 'xs', 'ys', 'strengths']:
+			setattr(scene['field'], key, arrays[key])
+		stepTile(scene, tile, barrier, arrays)
+	except BrokenBarrierError:
+		pass
+	except Exception:
+		# Releasing the other workers from the barrier so the run stops rather than hangs
+		barrier.abort()
+		raise
+	finally:
+		# Dropping the views into the shared memory before detaching from it
+		scene['field'].values = scene['field'].xs = scene['field'].ys = scene['field'].strengths = None
+		arrays.clear()
+		for block in blocks.values():
+			block.close()
+
+
+# Steps the vehicles of the given tile, exchanging migrating vehicles with the other tiles at the step barriers
+def stepTile(scene, tile, barrier, arrays):
+	field = scene['field']
+	vehicles = copy.copy(scene['vehicle'])
+	poses = arrays['poses'][tile]
+	counts = arrays['counts']
+	outbox = arrays['outbox']
+	outCounts = arrays['outCounts']
+	timings = arrays['timings'][tile]
+	tileCount = len(counts)
+
+	for step in range(scene['steps']):
+
+		# Moving the vehicles of the tile
+		start = time.perf_counter()
+		count = counts[tile]
+		vehicles.setPoses(poses[:count])
+		rX, rY, lX, lY = vehicles.getSensorLocations()
+		vehicles.processInput(field.getValues(rX, rY), field.getValues(lX, lY), scene['timeQuantum'])
+		vehicles.wrap(scene['width'], scene['height'])
+
+		# Moving the vehicles that left the tile to its outbox, and compacting the ones that stayed
+		destinations = getTiles(vehicles.x, vehicles.y, scene['width'], scene['height'], scene['tiles'])
+		leaving = destinations != tile
+		outCount = np.count_nonzero(leaving)
+		outbox[tile, :outCount, :4] = poses[:count][leaving]
+		outbox[tile, :outCount, 4] = destinations[leaving]
+		outCounts[tile] = outCount
+		staying = poses[:count][~leaving]
+		poses[:len(staying)] = staying
+		counts[tile] = len(staying)
+		timings[0] += time.perf_counter() - start
+		timings[2] += outCount
+		waitStart = time.perf_counter()
+		barrier.wait()
+		timings[1] += time.perf_counter() - waitStart
+
+		# Taking in the vehicles that arrived from the other tiles, with the first tile also moving the sources for
+		# the next step now that every tile has sensed the field
+		start = time.perf_counter()
+		if tile == 0:
+			field.advanceSources(scene['sources'], scene['time'] + (step + 1) * scene['timeQuantum'])
+		for other in range(tileCount):
+			if other == tile or outCounts[other] == 0:
+				continue
+			rows = outbox[other, :outCounts[other]]
+			arrivals = rows[rows[:, 4] == tile, :4]
+			count = counts[tile]
+			poses[count:count + len(arrivals)] = arrivals
+			counts[tile] = count + len(arrivals)
+		timings[0] += time.perf_counter() - start
+
+		# Waiting until every tile has taken its arrivals before the outboxes are refilled
+		waitStart = time.perf_counter()
+		barrier.wait()
+		timings[1] += time.perf_counter() - waitStart
+
+
+# Runs copies of the same swarm on a single tile and split into each of the given tile layouts, reporting the
+# speedup and efficiency per core of each layout against the single tile
+def measureScaling(environment, count, steps, layouts=((2, 1), (2, 2)), seed=0):
+	reports = [Swarm(environment, count, tiles, seed).run(steps) for tiles in ((1, 1),) + tuple(layouts)]
+	baseline = reports[0]['wallTime']
+	return [{
+		'workers': report['workers'],
+		'wallTime': report['wallTime'],
+		'speedup': baseline / report['wallTime'],
+		'efficiency': baseline / (report['wallTime'] * report['workers']),
+		'busyEfficiencies': report['efficiencies']
+	} for report in reports]
@@ -0,0 +1,54 @@
+# Checks that Ensemble results do not depend on how the replicas are split into blocks and worker processes, and
+# that environments without sources are summarized without distances. Run with "python test_ensemble.py" or
+# "python -m pytest"
+
+# Imports
+import unittest
+import warnings
+import numpy as np
+from ensemble import Ensemble
+from mocks import createEnvironment
+
+# Tests for Ensemble
+class EnsembleTest(unittest.TestCase):
+
+	# Runs an ensemble of the given environment split into blocks of the given size across the given number of
+	# worker processes, returning its summary
+	def getSummary(self, environment, blockSize, workers):
+		ensemble = Ensemble(environment, 300, 150, sensorNoise=0.5, motorNoise=0.05, seed=7, workers=workers)
+		ensemble.blockSize = blockSize
+		return ensemble.run().summary()
+
+	# One worker with large blocks and several workers with small ones give the same results, with the sensors
+	# crossed and inhibited so that some of the replicas reach a source
+	def testIndependentOfBlocksAndWorkers(self):
+		environment = createEnvironment()
+		environment.addSource(1, 1)
+		environment.addSource(5, 2)
+		environment.state['vehicle'].setLeftSensorAttachment('right')
+		environment.state['vehicle'].setRightSensorAttachment('left')
+		environment.state['vehicle'].setLeftSensorInhibit(True)
+		environment.state['vehicle'].setRightSensorInhibit(True)
+		single = self.getSummary(environment, 256, 1)
+		split = self.getSummary(environment, 100, 3)
+
+		self.assertEqual(split['replicas'], 300)
+		self.assertGreater(single['captureRate'], 0)
+		self.assertEqual(split['captureRate'], single['captureRate'])
+		np.testing.assert_array_equal(split['occupancy'], single['occupancy'])
+		for key in ['distanceMean', 'distanceVariance', 'finalDistanceMean', 'finalDistanceVariance', 'captureTimeMean']:
+			self.assertAlmostEqual(split[key], single[key], delta=1e-9 * abs(single[key]))
+
+	# Without sources there are no distances to summarize, which are reported as None without warnings
+	def testNoSources(self):
+		with warnings.catch_warnings():
+			warnings.simplefilter('error')
+			summary = Ensemble(createEnvironment(), 10, 20, 0.1, 0.1).run().summary()
+		self.assertEqual(summary['replicas'], 10)
+		self.assertEqual(summary['captureRate'], 0.0)
+		for key in ['distanceMean', 'distanceVariance', 'finalDistanceMean', 'finalDistanceVariance', 'captureTimeMean']:
+			self.assertIsNone(summary[key])
+
+
+if __name__ == '__main__':
+	unittest.main()
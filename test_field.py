@@ -0,0 +1,65 @@
+# Checks that the cached values of SourceField stay in step with its sources as they are updated. Run with
+# "python test_field.py" or "python -m pytest"
+
+# Imports
+import unittest
+import numpy as np
+from field import SourceField
+from mocks import createEnvironment
+
+# Tests for SourceField
+class SourceFieldTest(unittest.TestCase):
+
+	# Creates a field with a grid of sources of different strengths, with its cached values built
+	def createField(self):
+		field = SourceField(512, 512, 64)
+		for i in range(12):
+			field.addSource(40 * i + 20, 30 * i + 50, i % 4 + 1)
+		field.rebuild()
+		return field
+
+	# Checks that the cached values of the given field match those rebuilt from scratch
+	def assertMatchesRebuild(self, field):
+		values = field.values.copy()
+		field.rebuild()
+		np.testing.assert_allclose(values, field.values, rtol=1e-12, atol=1e-12)
+
+	# Moves a few of the sources, which swaps their contributions to the cached values
+	def testUpdateMatchesRebuild(self):
+		field = self.createField()
+		for step in range(50):
+			field.updateSources([1, 5], [100 + step, 300], [200, 7 * step], [2, (step % 3) * 1.5])
+		self.assertMatchesRebuild(field)
+
+	# Moves most of the sources, which rebuilds the cached values
+	def testUpdateManyMatchesRebuild(self):
+		field = self.createField()
+		field.updateSources(range(10), np.arange(10) * 50, np.full(10, 256), np.ones(10))
+		self.assertMatchesRebuild(field)
+
+	# Steps moving, pulsing and blinking sources of an environment among static ones, which matches a field built
+	# at the same time
+	def testAdvanceSourcesMatchesSourceStates(self):
+		environment = createEnvironment()
+		for x, y in [(1, 1), (4, 2), (2, 5), (6, 6), (0, 6), (6, 0)]:
+			environment.addSource(x, y)
+		environment.setSourcePath(0, [(100, 100), (400, 120), (250, 400)], 0.05)
+		environment.setSourcePulse(1, 700, 0.5)
+		environment.setSourceBlink(2, 300, 200)
+		field = environment.state['field']
+		field.rebuild()
+		sources = environment.getDynamicSources()
+		for step in range(120):
+			field.advanceSources(sources, step * environment.timeQuantum)
+
+		time = 119 * environment.timeQuantum
+		expected = SourceField(512, 512, 64)
+		for index, source in enumerate(environment.state['sources']):
+			expected.addSource(*source.getState(time))
+		expected.rebuild()
+		np.testing.assert_allclose(field.strengths, expected.strengths)
+		np.testing.assert_allclose(field.values, expected.values, rtol=1e-12, atol=1e-12)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,35 @@
+# Checks that Source rejects time-varying behaviours that cannot be stepped. Run with "python test_source.py" or
+# "python -m pytest"
+
+# Imports
+import unittest
+from mocks import MockCanvas
+from source import Source
+
+# Tests for Source
+class SourceTest(unittest.TestCase):
+
+	# Paths with a negative speed are rejected
+	def testRejectsNegativeSpeed(self):
+		source = Source(MockCanvas(), 100, 100)
+		with self.assertRaises(ValueError):
+			source.setPath([(100, 100), (200, 100)], -0.1)
+
+	# Pulses without a positive period are rejected
+	def testRejectsNonPositivePeriod(self):
+		source = Source(MockCanvas(), 100, 100)
+		for period in [0, -100]:
+			with self.assertRaises(ValueError):
+				source.setPulse(period, 0.5)
+
+	# Blinks without positive on and off durations are rejected
+	def testRejectsNonPositiveDurations(self):
+		source = Source(MockCanvas(), 100, 100)
+		for onDuration, offDuration in [(0, 0), (0, 100), (100, 0), (-100, 200)]:
+			with self.assertRaises(ValueError):
+				source.setBlink(onDuration, offDuration)
+		self.assertIsNone(source.blink)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,56 @@
+# Checks that SteadyStateDetector only settles vehicles that really hold still, orbit or travel straight. Run with
+# "python test_steadystate.py" or "python -m pytest"
+
+# Imports
+import unittest
+import numpy as np
+from mocks import createEnvironment
+from steadystate import SteadyStateDetector, runUntilSteady
+
+# Tests for SteadyStateDetector
+class SteadyStateDetectorTest(unittest.TestCase):
+
+	# Feeds the given poses to a detector, returning it along with the step it settled at (None if it never did)
+	def detect(self, poses):
+		detector = SteadyStateDetector(512, 512)
+		for step, pose in enumerate(poses):
+			if detector.update(np.array(pose, dtype=float)) is not None:
+				return detector, step
+		return detector, None
+
+	# A vehicle creeping forward by less than the position tolerance each step is travelling, not holding still
+	def testCreepingIsNotFixed(self):
+		detector, step = self.detect([[100, 200 - 0.04 * i, 1, 0] for i in range(100)])
+		self.assertEqual(detector.behaviour, 'straight')
+		self.assertEqual(detector.turn, 0)
+		self.assertGreaterEqual(step, detector.settleSteps)
+
+	# A vehicle holding still settles only after holding still for the settle steps
+	def testStillIsFixed(self):
+		detector, step = self.detect([[100, 200, 0, 1]] * 100)
+		self.assertEqual(detector.behaviour, 'fixed')
+		self.assertEqual(detector.period, 1)
+		self.assertEqual(step, detector.settleSteps)
+
+	# A vehicle going around a circle in a whole number of steps settles as a cycle of that period
+	def testCircleIsCycle(self):
+		angles = 2 * np.pi * np.arange(200) / 25
+		detector, step = self.detect(np.column_stack((256 + 50 * np.cos(angles), 256 + 50 * np.sin(angles), np.cos(angles), np.sin(angles))))
+		self.assertEqual(detector.behaviour, 'cycle')
+		self.assertAlmostEqual(detector.period, 25)
+
+
+# Tests for runUntilSteady
+class RunUntilSteadyTest(unittest.TestCase):
+
+	# A vehicle among sources that change over time is never treated as settled
+	def testRejectsDynamicSources(self):
+		environment = createEnvironment()
+		environment.addSource(1, 1)
+		environment.setSourcePulse(0, 700, 0.5)
+		with self.assertRaises(ValueError):
+			runUntilSteady(environment, 100)
+
+
+if __name__ == '__main__':
+	unittest.main()
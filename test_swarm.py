@@ -0,0 +1,53 @@
+# Checks that splitting a swarm into tiles does not change how its vehicles move, including when they gather in
+# one tile. Run with "python test_swarm.py" or "python -m pytest"
+
+# Imports
+import unittest
+import numpy as np
+from mocks import createEnvironment
+from swarm import Swarm
+
+# Tests for Swarm
+class SwarmTest(unittest.TestCase):
+
+	# Gets the given poses sorted by location, so that runs handing vehicles between tiles can be compared
+	def getSorted(self, poses):
+		return poses[np.lexsort((poses[:, 1], poses[:, 0]))]
+
+	# Runs the same swarm on one tile and on four, with the default wiring crowding the vehicles into the tile
+	# across from a single source, past twice an even share of them
+	def testTilesMatchSingleTile(self):
+		environment = createEnvironment()
+		environment.addSource(1, 1)
+		single = Swarm(environment, 1000, (1, 1), seed=3)
+		single.run(800)
+		tiled = Swarm(environment, 1000, (2, 2), seed=3)
+		report = tiled.run(800)
+
+		self.assertGreater(report['migrations'], 0)
+		self.assertEqual(len(tiled.poses), 1000)
+		np.testing.assert_allclose(self.getSorted(tiled.poses), self.getSorted(single.poses), rtol=0, atol=1e-9)
+
+	# Runs the same swarm on one tile and on four around a moving, pulsing source, which the first tile moves for
+	# every tile between steps, and checks that the source ends up where it is at the end of the run
+	def testTilesMatchSingleTileWithMovingSource(self):
+		environment = createEnvironment()
+		environment.addSource(1, 1)
+		environment.addSource(5, 5)
+		environment.setSourcePath(0, [(100, 100), (400, 120), (250, 400)], 0.05)
+		environment.setSourcePulse(1, 700, 0.5)
+		single = Swarm(environment, 500, (1, 1), seed=4)
+		single.run(300)
+		tiled = Swarm(environment, 500, (2, 2), seed=4)
+		tiled.run(200)
+		tiled.run(100)
+
+		np.testing.assert_allclose(self.getSorted(tiled.poses), self.getSorted(single.poses), rtol=0, atol=1e-9)
+		x, y, strength = environment.state['sources'][0].getState(300 * environment.timeQuantum)
+		self.assertAlmostEqual(tiled.field.xs[0] * tiled.field.cellSize, x)
+		self.assertAlmostEqual(tiled.field.ys[0] * tiled.field.cellSize, y)
+		self.assertNotEqual(tiled.field.strengths[1], environment.state['field'].strengths[1])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,55 @@
+# Checks that VehicleBatch moves vehicles the same way as Vehicle, stepping a Vehicle on a mock canvas alongside
+# a one-vehicle batch for every wiring. Run with "python test_vehiclebatch.py" or "python -m pytest"
+
+# Imports
+import itertools
+import unittest
+import numpy as np
+from field import SourceField
+from mocks import MockCanvas
+from vehicle import Vehicle
+from vehiclebatch import VehicleBatch
+
+# Tests for VehicleBatch
+class VehicleBatchTest(unittest.TestCase):
+
+	# Gets the pose [x, y, ux, uy] of the given vehicle
+	def getPose(self, vehicle):
+		u = np.array([vehicle.rWheel['x'] - vehicle.x, vehicle.rWheel['y'] - vehicle.y])
+		return np.concatenate(([vehicle.x, vehicle.y], u / np.linalg.norm(u)))
+
+	# Steps a vehicle and a batch of one from the same pose for every wiring, checking that the sensor locations
+	# and the poses they move to match at every step
+	def testMatchesVehicle(self):
+		field = SourceField(512, 512, 64)
+		for x, y in [(128, 128), (384, 192), (256, 448)]:
+			field.addSource(x, y, 5)
+
+		for lAttach, rAttach, lSInhibit, rSInhibit, lWInhibit, rWInhibit in itertools.product(['left', 'right'], ['left', 'right'], [False, True], [False, True], [False, True], [False, True]):
+			vehicle = Vehicle(None, MockCanvas(), 256, 256)
+			vehicle.setLeftSensorAttachment(lAttach)
+			vehicle.setRightSensorAttachment(rAttach)
+			vehicle.setLeftSensorInhibit(lSInhibit)
+			vehicle.setRightSensorInhibit(rSInhibit)
+			vehicle.setLeftWheelInhibit(lWInhibit)
+			vehicle.setRightWheelInhibit(rWInhibit)
+			batch = VehicleBatch(vehicle, 1)
+
+			for step in range(300):
+				# Starting each step from the vehicle's pose, so small differences are not amplified over the run
+				batch.poses[0] = self.getPose(vehicle)
+				rX, rY, lX, lY = batch.getSensorLocations()
+				np.testing.assert_allclose(
+					[rX[0], rY[0], lX[0], lY[0]],
+					[vehicle.rSensor['x'], vehicle.rSensor['y'], vehicle.lSensor['x'], vehicle.lSensor['y']],
+					rtol=0, atol=1e-6)
+				rInput = field.getValue(vehicle.rSensor['x'], vehicle.rSensor['y'])
+				lInput = field.getValue(vehicle.lSensor['x'], vehicle.lSensor['y'])
+				vehicle.processInput(rInput, lInput, 10)
+				batch.processInput(np.array([rInput]), np.array([lInput]), 10)
+				np.testing.assert_allclose(batch.poses[0], self.getPose(vehicle), rtol=0, atol=1e-6,
+					err_msg='wiring ' + str((lAttach, rAttach, lSInhibit, rSInhibit, lWInhibit, rWInhibit)) + ' at step ' + str(step))
+
+
+if __name__ == '__main__':
+	unittest.main()
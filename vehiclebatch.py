@@ -0,0 +1,121 @@
+# Imports
+import numpy as np
+
+# Headless batch of vehicles sharing one wiring, stepped together with the same kinematics as Vehicle
+class VehicleBatch:
+
+	# Constructor, taking the wiring and dimensions from the given vehicle and placing count copies of it at its pose
+	def __init__(self, vehicle, count, poses=None):
+		self.speedRatio = vehicle.speedRatio
+		self.width = vehicle.width
+		self.height = vehicle.height
+		self.maxSpeed = vehicle.maxSpeed
+		self.maxSensor = vehicle.maxSensor
+		self.lSensor = {'inhibitory': vehicle.lSensor['inhibitory'], 'attachment': vehicle.lSensor['attachment']}
+		self.rSensor = {'inhibitory': vehicle.rSensor['inhibitory'], 'attachment': vehicle.rSensor['attachment']}
+		self.lWheelInhibitory = vehicle.lWheel['inhibitory']
+		self.rWheelInhibitory = vehicle.rWheel['inhibitory']
+
+		# The poses of the vehicles, one row of [x, y, ux, uy] each, where (ux, uy) is the unit vector from
+		# the center of the vehicle to its right wheel
+		if poses is None:
+			u = np.array([vehicle.rWheel['x'] - vehicle.x, vehicle.rWheel['y'] - vehicle.y])
+			u = u / np.linalg.norm(u)
+			poses = np.empty((count, 4))
+			poses[:] = [vehicle.x, vehicle.y, u[0], u[1]]
+		self.setPoses(poses)
+
+	# Sets the array the vehicle poses are read from and written to
+	def setPoses(self, poses):
+		self.poses = poses
+		self.x = poses[:, 0]
+		self.y = poses[:, 1]
+		self.ux = poses[:, 2]
+		self.uy = poses[:, 3]
+
+	# Gets the canvas locations of the right and left sensors of each vehicle
+	def getSensorLocations(self):
+		# The forward direction of the vehicle is perpendicular to the wheel axis
+		xForward = self.height/2 * self.uy
+		yForward = -self.height/2 * self.ux
+		rX = self.x + self.width/4 * self.ux + xForward
+		rY = self.y + self.width/4 * self.uy + yForward
+		lX = self.x - self.width/4 * self.ux + xForward
+		lY = self.y - self.width/4 * self.uy + yForward
+		return rX, rY, lX, lY
+
+	# Gets the speeds of the right and left wheels of each vehicle for the given arrays of sensor inputs
+	def getWheelSpeeds(self, rightInput, leftInput):
+		iRight = rightInput
+		iLeft = leftInput
+		if self.rSensor['inhibitory']:
+			iRight = self.maxSensor - iRight
+		if self.lSensor['inhibitory']:
+			iLeft = self.maxSensor - iLeft
+		vRight = np.zeros(len(self.poses))
+		vLeft = np.zeros(len(self.poses))
+		if self.rSensor['attachment'] == 'right':
+			vRight += self.speedRatio * iRight
+		else:
+			vLeft += self.speedRatio * iRight
+		if self.lSensor['attachment'] == 'left':
+			vLeft += self.speedRatio * iLeft
+		else:
+			vRight += self.speedRatio * iLeft
+		vRight = np.minimum(vRight, self.maxSpeed)
+		vLeft = np.minimum(vLeft, self.maxSpeed)
+		if self.rWheelInhibitory:
+			vRight = self.maxSpeed - vRight
+		if self.lWheelInhibitory:
+			vLeft = self.maxSpeed - vLeft
+		return vRight, vLeft
+
+	# Processes the given arrays of sensor inputs, moving each vehicle as Vehicle.processInput would, with the
+	# optional arrays of noise added to the sensor inputs and the wheel velocities
+	def processInput(self, rightInput, leftInput, duration, sensorNoise=None, motorNoise=None):
+		t = duration
+
+		# Getting the speed of each wheel
+		if sensorNoise is not None:
+			rightInput = rightInput + sensorNoise[0]
+			leftInput = leftInput + sensorNoise[1]
+		vRight, vLeft = self.getWheelSpeeds(rightInput, leftInput)
+		if motorNoise is not None:
+			vRight = vRight + motorNoise[0]
+			vLeft = vLeft + motorNoise[1]
+		vAvg = (vRight + vLeft) / 2
+
+		# Getting the rotation of the turning vehicles about their turn centers
+		turning = vRight != vLeft
+		# (vehicles moving straight get an infinite radius here, but their rotation is discarded below)
+		with np.errstate(divide='ignore', invalid='ignore'):
+			turnRadius = np.where(vRight == 0, 0.5 * self.width, 0.5 * self.width + self.width/((vLeft/vRight) - 1))
+			theta = np.where(turning & (turnRadius != 0), vAvg / turnRadius * t, 0)
+			cosVal = np.cos(theta)
+			sinVal = np.sin(theta)
+			xTurn = self.x + turnRadius * self.ux
+			yTurn = self.y + turnRadius * self.uy
+			xOld = self.x - xTurn
+			yOld = self.y - yTurn
+			xRotated = xOld * cosVal - yOld * sinVal + xTurn
+			yRotated = xOld * sinVal + yOld * cosVal + yTurn
+
+		# Getting the translation of the vehicles moving forward
+		distance = vAvg * t
+		xForward = self.x + distance * self.uy
+		yForward = self.y - distance * self.ux
+
+		# Moving the vehicles
+		self.x[:] = np.where(turning, xRotated, xForward)
+		self.y[:] = np.where(turning, yRotated, yForward)
+		ux = self.ux * cosVal - self.uy * sinVal
+		uy = self.ux * sinVal + self.uy * cosVal
+		self.ux[:] = ux
+		self.uy[:] = uy
+
+	# Moves the vehicles that are out of bounds to the opposite side of the given space, as Environment.moveVehicle does
+	def wrap(self, width, height):
+		self.x[:] = np.where(self.x < 0, self.x + width, self.x)
+		self.x[:] = np.where(self.x > width, self.x - width, self.x)
+		self.y[:] = np.where(self.y < 0, self.y + height, self.y)
+		self.y[:] = np.where(self.y > height, self.y - height, self.y)